@@ -1,6 +1,8 @@
 # app.py
+import uuid
 import streamlit as st
 from services.agent_graph import get_graph
+from utils.turn_log import get_turn_logger, invoke_traced
 
 st.set_page_config(page_title="Medical Symptom Analyzer", page_icon="🏥")
 
@@ -10,6 +12,7 @@ if 'symptoms' not in st.session_state:
     st.session_state.question_count = 0
     st.session_state.conversation = []
     st.session_state.status = 'ongoing'
+    st.session_state.session_id = uuid.uuid4().hex
 
 st.title("🏥 Medical Symptom Analyzer")
 
@@ -36,15 +39,22 @@ if st.session_state.status == 'ongoing':
         with st.spinner("Analyzing..."):
             # Run graph
             graph = get_graph()
-            result = graph.invoke({
+            inputs = {
                 'symptoms': st.session_state.symptoms,
                 'question_count': st.session_state.question_count,
                 'user_input': user_input,
                 'search_results': {},
                 'agent_response': {},
                 'specialist': '',
-                'status': 'ongoing'
-            })
+                'status': 'ongoing',
+                'cache_hit': False
+            }
+            turn_logger = get_turn_logger()
+            if turn_logger is None:
+                result = graph.invoke(inputs)
+            else:
+                result, _, _ = invoke_traced(graph, inputs, turn_logger,
+                                             st.session_state.session_id, st.session_state.question_count)
             
             # Update state
             st.session_state.symptoms = result['symptoms']
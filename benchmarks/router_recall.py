@@ -0,0 +1,147 @@
+# benchmarks/router_recall.py
+"""
+Recall@k of category-routed search against exhaustive search.
+
+    python -m benchmarks.router_recall [--k 3] [--categories 40]
+
+Runs twice: once on the live corpus in services/vector_search.py (hybrid
+dense + BM25 search), and once on a synthetic corpus with many specialty
+categories (BM25 only) to show how routing cost scales.
+
+The mock dense searchers ignore the query, so every category's first dense
+hit ties on fused score. Recall is therefore measured over results with
+symptom overlap (bm25_score > 0); query-independent hits are not ranked.
+"""
+import argparse
+import itertools
+import random
+import time
+
+from services.category_router import CategoryRouter
+from services.lexical_index import SymptomIndex
+from services import vector_search
+
+
+def _global_top(results, k):
+    """Merge {category: [diseases]} into one top-k list of disease ids by fused score."""
+    rows = [d for diseases in results.values() for d in diseases if d.get('bm25_score', 1.0) > 0]
+    rows.sort(key=lambda d: (-d['rrf_score'], d['disease_id']))
+    return [d['disease_id'] for d in rows[:k]]
+
+
+def evaluate(router, search, categories, queries, k):
+    """
+    Args:
+        router: CategoryRouter
+        search: callable(category, symptoms, k) -> [diseases with rrf_score]
+        categories: all category names (exhaustive search)
+        queries: list of symptom sets
+        k: depth for recall@k
+
+    Returns:
+        dict with recall@k, mean categories searched, fallback rate and timings
+    """
+    recall_sum = 0.0
+    searched = 0
+    fallbacks = 0
+    t_exhaustive = 0.0
+    t_routed = 0.0
+
+    for symptoms in queries:
+        t0 = time.perf_counter()
+        exhaustive = {c: search(c, symptoms, k) for c in categories}
+        t1 = time.perf_counter()
+        plan = router.route(symptoms, k)
+        routed = {c: search(c, symptoms, ck) for c, ck in plan.items()}
+        t2 = time.perf_counter()
+
+        t_exhaustive += t1 - t0
+        t_routed += t2 - t1
+        searched += len(plan)
+        fallbacks += len(plan) == len(categories)
+
+        truth = _global_top(exhaustive, k)
+        got = set(_global_top(routed, k))
+        recall_sum += len(got.intersection(truth)) / len(truth) if truth else 1.0
+
+    n = len(queries) or 1
+    return {
+        'queries': len(queries),
+        'recall_at_k': recall_sum / n,
+        'mean_categories': searched / n,
+        'total_categories': len(categories),
+        'fallback_rate': fallbacks / n,
+        'exhaustive_ms': 1000 * t_exhaustive / n,
+        'routed_ms': 1000 * t_routed / n,
+    }
+
+
+def _profile_queries(diseases, max_size=3):
+    """Every non-empty subset (up to max_size) of each disease's symptom profile."""
+    queries = set()
+    for disease in diseases:
+        symptoms = disease['symptoms']
+        for size in range(1, min(max_size, len(symptoms)) + 1):
+            for combo in itertools.combinations(symptoms, size):
+                queries.add(frozenset(combo))
+    return [set(q) for q in sorted(queries, key=sorted)]
+
+
+def live_corpus(k):
+    diseases = [d for ds in vector_search.DISEASE_CATALOG.values() for d in ds]
+    return evaluate(
+        vector_search.get_category_router(),
+        vector_search.hybrid_search,
+        list(vector_search.CATEGORY_SEARCHERS),
+        _profile_queries(diseases),
+        k,
+    )
+
+
+def synthetic_corpus(k, n_categories, diseases_per_category=20, seed=0):
+    rng = random.Random(seed)
+    shared = [f"shared_{i}" for i in range(30)]
+    index = SymptomIndex()
+    diseases = []
+    for c in range(n_categories):
+        vocab = [f"c{c}_symptom_{i}" for i in range(25)]
+        for j in range(diseases_per_category):
+            symptoms = rng.sample(vocab, 4) + rng.sample(shared, rng.randint(0, 2))
+            disease = {'disease_id': f"c{c}_d{j}", 'name': f"c{c}_d{j}", 'symptoms': symptoms}
+            index.add_disease(disease, f"category_{c}")
+            diseases.append(disease)
+
+    def search(category, symptoms, depth):
+        return [
+            {'disease_id': d, 'rrf_score': s}
+            for d, s in index.search(symptoms, k=depth, category=category)
+        ]
+
+    categories = [f"category_{c}" for c in range(n_categories)]
+    queries = _profile_queries(rng.sample(diseases, min(200, len(diseases))), max_size=2)
+    return evaluate(CategoryRouter.from_index(index, categories), search, categories, queries, k)
+
+
+def _print(title, report):
+    print(title)
+    print(f"  queries            {report['queries']}")
+    print(f"  recall@k           {report['recall_at_k']:.3f}")
+    print(f"  categories/query   {report['mean_categories']:.2f} of {report['total_categories']}")
+    print(f"  fallback rate      {report['fallback_rate']:.1%}")
+    print(f"  exhaustive ms/q    {report['exhaustive_ms']:.3f}")
+    print(f"  routed ms/q        {report['routed_ms']:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--k', type=int, default=3)
+    parser.add_argument('--categories', type=int, default=40, help="synthetic corpus size")
+    args = parser.parse_args()
+
+    _print(f"Live corpus (k={args.k})", live_corpus(args.k))
+    _print(f"Synthetic corpus, {args.categories} categories (k={args.k})",
+           synthetic_corpus(args.k, args.categories))
+
+
+if __name__ == '__main__':
+    main()
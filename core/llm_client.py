@@ -1,6 +1,7 @@
 # core/llm_client.py
 import os
 from typing import List, Dict, Optional, Any
+from core.tracing import TracedLLM, current_trace, get_llm_override
 
 # Optional: Streamlit secrets support (does nothing outside Streamlit)
 try:
@@ -117,7 +118,23 @@ def get_llm_client(
       - provider: explicit arg > LLM_PROVIDER env/secret > 'mock'
       - api_key:  explicit arg > ENV/secret > (required for real providers)
       - model:    explicit arg > ENV/secret > default per provider
+
+    An override set with core.tracing.use_llm() wins over all of the above,
+    and clients created during a traced turn record their calls.
     """
+    client = get_llm_override()
+    if client is None:
+        client = _make_client(provider, api_key, model)
+    if current_trace() is not None:
+        return TracedLLM(client)
+    return client
+
+
+def _make_client(
+    provider: Optional[str],
+    api_key: Optional[str],
+    model: Optional[str],
+):
     prov = (provider or _get_secret("LLM_PROVIDER") or "mock").lower()
 
     if prov == "groq":
@@ -136,3 +153,16 @@ def get_llm_client(
 
     # Default to mock for local/dev
     return _MockLLM()
+
+
+def get_model_id(provider: Optional[str] = None, model: Optional[str] = None) -> str:
+    """
+    "provider:model" that get_llm_client() would use, without needing an API key.
+    Used to version anything derived from model output.
+    """
+    prov = (provider or _get_secret("LLM_PROVIDER") or "mock").lower()
+    if prov == "groq":
+        return f"groq:{model or _get_secret('GROQ_MODEL') or 'llama-3.1-8b-instant'}"
+    if prov == "openai":
+        return f"openai:{model or _get_secret('OPENAI_MODEL') or 'gpt-4o-mini'}"
+    return "mock"
@@ -0,0 +1,96 @@
+# core/tracing.py
+"""
+Per-turn tracing: node timings and raw LLM traffic for one graph.invoke.
+
+State lives in context variables, so concurrent turns (e.g. parallel
+replays) each see their own trace and their own LLM override.
+"""
+import contextvars
+import functools
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("turn_trace", default=None)
+_llm_override: contextvars.ContextVar = contextvars.ContextVar("llm_override", default=None)
+
+
+class TurnTrace:
+    def __init__(self):
+        self.llm_calls: List[Dict[str, Any]] = []
+        self.node_timings: List[Dict[str, Any]] = []
+
+    @property
+    def llm_ms(self) -> float:
+        return sum(c["duration_ms"] for c in self.llm_calls)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"llm_calls": list(self.llm_calls), "node_timings": list(self.node_timings)}
+
+
+def current_trace() -> Optional[TurnTrace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def start_trace():
+    """Collect node timings and LLM calls made inside the block."""
+    trace = TurnTrace()
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def timed_node(name: str, fn: Callable) -> Callable:
+    """Wrap a graph node so its wall time is added to the active trace."""
+    @functools.wraps(fn)
+    def wrapper(state, *args, **kwargs):
+        trace = _current_trace.get()
+        if trace is None:
+            return fn(state, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return fn(state, *args, **kwargs)
+        finally:
+            trace.node_timings.append({"node": name, "ms": (time.perf_counter() - start) * 1000})
+    return wrapper
+
+
+def get_llm_override():
+    return _llm_override.get()
+
+
+@contextmanager
+def use_llm(client):
+    """Make get_llm_client() return `client` inside the block (used by replay and offline jobs)."""
+    token = _llm_override.set(client)
+    try:
+        yield client
+    finally:
+        _llm_override.reset(token)
+
+
+class TracedLLM:
+    """Client wrapper that records each request/response pair into the active trace."""
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    def chat(self, messages: List[Dict[str, str]], temperature: float = 0.2, **kwargs: Any) -> str:
+        start = time.perf_counter()
+        call: Dict[str, Any] = {"request": {"messages": messages, "temperature": temperature, **kwargs}}
+        try:
+            response = self.inner.chat(messages, temperature=temperature, **kwargs)
+            call["response"] = response
+            return response
+        except Exception as e:
+            # Failed calls (timeouts, HTTP errors) are what slow sessions are made of
+            call["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            call["duration_ms"] = (time.perf_counter() - start) * 1000
+            trace = _current_trace.get()
+            if trace is not None:
+                trace.llm_calls.append(call)
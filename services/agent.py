@@ -2,9 +2,12 @@
 from __future__ import annotations
 from typing import Dict, Any, List
 from core.llm_client import get_llm_client
+from services.stopping import StoppingPolicy, get_stopping_policy, normalize_category
 import json
 import re
 
+AGENT_PROVIDER = "groq"
+
 NO_SYMPTOMS_REPLY = {
     "top_diseases": [],
     "clarifying_question": (
@@ -15,8 +18,9 @@ NO_SYMPTOMS_REPLY = {
 }
 
 class DiagnosticAgent:
-    def __init__(self):
-        self.llm = get_llm_client("groq")
+    def __init__(self, policy: StoppingPolicy | None = None):
+        self.llm = get_llm_client(AGENT_PROVIDER)
+        self.policy = policy or get_stopping_policy()
 
     def process(self, search_results: Dict[str, List[Dict[str, Any]]], session_state: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -94,7 +98,7 @@ JSON:"""
     # ------------------------
 
     def _build_context(self, search_results: Dict[str, List[Dict[str, Any]]], session_state: Dict[str, Any]) -> str:
-        sym_list = list(session_state.get("symptoms", []))
+        sym_list = sorted(session_state.get("symptoms", []))  # stable prompt across hash seeds
         question_count = int(session_state.get("question_count", 0))
 
         lines = []
@@ -142,7 +146,7 @@ JSON:"""
         """
         - Keep only dict items with `disease` (str) and `confidence` (number).
         - Clamp confidence to [0,1].
-        - Ensure category is a string (optional).
+        - Normalize category onto our category keys (optional).
         - Sort by confidence desc and truncate to top 3.
         """
         norm: List[Dict[str, Any]] = []
@@ -159,34 +163,18 @@ JSON:"""
             c = float(conf)
             if c < 0.0: c = 0.0
             if c > 1.0: c = 1.0
-            cat = it.get("category")
-            if cat is not None and not isinstance(cat, str):
-                cat = str(cat)
-            norm.append({"disease": disease.strip(), "confidence": c, "category": cat or ""})
+            cat = normalize_category(it.get("category"))
+            norm.append({"disease": disease.strip(), "confidence": c, "category": cat})
 
         norm.sort(key=lambda x: x["confidence"], reverse=True)
         return norm[:3]
 
     def check_threshold(self, diseases: List[Dict[str, Any]], question_count: int) -> bool:
         """
-        Stop asking questions if:
+        Stop asking questions when the configured stopping policy says so.
+        The default ThresholdPolicy stops if:
         - Asked 5+ questions already
         - Top disease confidence > 0.80 (very confident)
         - Top disease > 0.70 AND gap to 2nd > 0.20 (clear winner)
         """
-        if question_count >= 5:
-            return True
-
-        if not diseases:
-            return False
-
-        top1_conf = float(diseases[0].get("confidence", 0.0))
-        if top1_conf > 0.80:
-            return True
-
-        if len(diseases) > 1:
-            top2_conf = float(diseases[1].get("confidence", 0.0))
-            if top1_conf > 0.70 and (top1_conf - top2_conf) > 0.20:
-                return True
-
-        return False
+        return self.policy.should_stop(diseases, question_count)
@@ -1,8 +1,11 @@
 from langgraph.graph import StateGraph, END
 from typing import TypedDict, Set
 from services.symptom_extractor import extract_symptoms
-from services.vector_search import search_all_categories
+from services.vector_search import search_routed
 from services.agent import DiagnosticAgent
+from services.stopping import get_stopping_policy
+from services.warm_cache import get_warm_cache
+from core.tracing import timed_node
 
 class ConversationState(TypedDict):
     symptoms: Set[str]
@@ -12,6 +15,7 @@ class ConversationState(TypedDict):
     agent_response: dict
     specialist: str
     status: str
+    cache_hit: bool
 
 # Define nodes
 def extract_node(state: ConversationState):
@@ -21,9 +25,19 @@ def extract_node(state: ConversationState):
     state['question_count'] += 1
     return state
 
+def warm_cache_node(state: ConversationState):
+    """Serve precomputed diagnoses for common symptom sets"""
+    cache = get_warm_cache()
+    cached = cache.get(state['symptoms'], state['question_count']) if cache is not None else None
+    state['cache_hit'] = cached is not None
+    if cached is not None:
+        stop = get_stopping_policy().should_stop(cached.get('top_diseases', []), state['question_count'])
+        state['agent_response'] = dict(cached, should_continue=not stop)
+    return state
+
 def search_node(state: ConversationState):
-    """Search vector DBs"""
-    results = search_all_categories(state['symptoms'])
+    """Search the vector DBs the category router picks"""
+    results = search_routed(state['symptoms'])
     state['search_results'] = results
     return state
 
@@ -53,19 +67,35 @@ def should_continue(state: ConversationState):
     else:
         return "complete"
 
+def route_after_cache(state: ConversationState):
+    """Skip search and agent on a warm cache hit"""
+    if not state.get('cache_hit'):
+        return "miss"
+    return should_continue(state)
+
 # Build graph
 def create_graph():
     workflow = StateGraph(ConversationState)
     
     # Add nodes
-    workflow.add_node("extract", extract_node)
-    workflow.add_node("search", search_node)
-    workflow.add_node("agent", agent_node)
-    workflow.add_node("get_specialist", lookup_specialist_node)
+    workflow.add_node("extract", timed_node("extract", extract_node))
+    workflow.add_node("warm_cache", timed_node("warm_cache", warm_cache_node))
+    workflow.add_node("search", timed_node("search", search_node))
+    workflow.add_node("agent", timed_node("agent", agent_node))
+    workflow.add_node("get_specialist", timed_node("get_specialist", lookup_specialist_node))
     
     # Define edges
     workflow.set_entry_point("extract")
-    workflow.add_edge("extract", "search")
+    workflow.add_edge("extract", "warm_cache")
+    workflow.add_conditional_edges(
+        "warm_cache",
+        route_after_cache,
+        {
+            "miss": "search",
+            "continue": END,
+            "complete": "get_specialist"
+        }
+    )
     workflow.add_edge("search", "agent")
     
     # Conditional edge
@@ -0,0 +1,122 @@
+# services/category_router.py
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional
+import math
+
+from services.lexical_index import SymptomIndex, tokenize_symptoms
+
+
+class CategoryRouter:
+    """
+    Decide which category indexes to query for a set of symptoms.
+
+    Uses a sparse symptom -> category prior matrix P(category | symptom),
+    estimated from how often each symptom appears in each category's
+    disease profiles. Only rows for the query symptoms are touched, so
+    routing cost grows with the query, not with the number of categories.
+    """
+
+    def __init__(
+        self,
+        prior: Dict[str, Dict[str, float]],
+        categories: Iterable[str],
+        mass: float = 0.9,
+        min_confidence: float = 0.5,
+        min_coverage: float = 0.5,
+        max_categories: Optional[int] = None,
+    ):
+        """
+        Args:
+            prior: {symptom_term: {category: P(category | symptom)}}
+            categories: All known categories (used when falling back)
+            mass: Stop adding categories once their cumulative score reaches this
+            min_confidence: Below this top-category score, search every category
+            min_coverage: Below this fraction of recognised symptoms, search every category
+            max_categories: Hard cap on categories picked before fallback (None = no cap)
+        """
+        self.prior = prior
+        self.categories = list(categories)
+        self.mass = mass
+        self.min_confidence = min_confidence
+        self.min_coverage = min_coverage
+        self.max_categories = max_categories
+
+    @classmethod
+    def from_index(cls, index: SymptomIndex, categories: Optional[Iterable[str]] = None, **kwargs) -> "CategoryRouter":
+        """
+        Estimate the prior matrix from the diseases in a SymptomIndex.
+
+        When `categories` is given, only those categories (the ones that can
+        actually be searched) appear in the prior and in routing plans.
+        """
+        if categories is None:
+            categories = sorted({doc['category'] for doc in index.docs.values()})
+        categories = list(categories)
+        allowed = set(categories)
+
+        prior: Dict[str, Dict[str, float]] = {}
+        for term, posting in index.postings.items():
+            counts: Dict[str, float] = {}
+            for disease_id in posting:
+                category = index.docs[disease_id]['category']
+                if category in allowed:
+                    counts[category] = counts.get(category, 0.0) + 1.0
+            total = sum(counts.values())
+            if total:
+                prior[term] = {c: n / total for c, n in counts.items()}
+
+        return cls(prior, categories, **kwargs)
+
+    def category_scores(self, symptoms: Iterable[str]) -> Dict[str, float]:
+        """
+        Average P(category | symptom) over the recognised query symptoms.
+        Scores sum to 1 when at least one symptom is recognised.
+        """
+        terms = set(tokenize_symptoms(symptoms))
+        known = [t for t in terms if t in self.prior]
+        scores: Dict[str, float] = {}
+        for term in known:
+            for category, p in self.prior[term].items():
+                scores[category] = scores.get(category, 0.0) + p / len(known)
+        return scores
+
+    def route(self, symptoms: Iterable[str], k: int = 3) -> Dict[str, int]:
+        """
+        Pick categories to search and how many results to take from each.
+
+        The most likely category gets k results; the others get a share of k
+        proportional to their score (at least 1). When too few symptoms are
+        recognised or the top category is not dominant enough, the search is
+        widened to every category with the full k.
+
+        Returns:
+            {category: k_for_category}, most likely category first
+        """
+        symptoms = list(symptoms or [])
+        terms = set(tokenize_symptoms(symptoms))
+        scores = self.category_scores(symptoms)
+
+        coverage = len([t for t in terms if t in self.prior]) / len(terms) if terms else 0.0
+        ranked = sorted(scores.items(), key=lambda x: (-x[1], x[0]))
+        top_score = ranked[0][1] if ranked else 0.0
+
+        if not ranked or coverage < self.min_coverage or top_score < self.min_confidence:
+            return self._widen(ranked, k)
+
+        plan: Dict[str, int] = {}
+        cumulative = 0.0
+        for category, score in ranked:
+            if cumulative >= self.mass:
+                break
+            if self.max_categories is not None and len(plan) >= self.max_categories:
+                break
+            plan[category] = max(1, min(k, math.ceil(k * score / top_score)))
+            cumulative += score
+        return plan
+
+    def _widen(self, ranked: List, k: int) -> Dict[str, int]:
+        """Fallback: every category at full depth, scored categories first."""
+        plan = {category: k for category, _ in ranked}
+        for category in self.categories:
+            plan.setdefault(category, k)
+        return plan
@@ -0,0 +1,203 @@
+# services/lexical_index.py
+from __future__ import annotations
+from typing import Dict, Any, List, Iterable, Optional, Tuple
+import hashlib
+import json
+import math
+import os
+import re
+
+SYNONYMS_PATH = 'data/symptom_synonyms.json'
+
+_synonym_map: Optional[Dict[str, str]] = None
+
+
+def normalize_symptom(symptom: str) -> str:
+    """
+    Normalize a symptom string into an index term.
+
+    "Loss of taste", "loss-of-taste" and "loss_of_taste" all become "loss_of_taste".
+    """
+    return re.sub(r'[\s\-]+', '_', str(symptom).lower().strip()).strip('_')
+
+
+def _load_synonym_map() -> Dict[str, str]:
+    """
+    Build {synonym_term: canonical_term} from data/symptom_synonyms.json.
+    Canonical terms map to themselves.
+    """
+    global _synonym_map
+    if _synonym_map is not None:
+        return _synonym_map
+
+    mapping: Dict[str, str] = {}
+    if os.path.exists(SYNONYMS_PATH):
+        try:
+            with open(SYNONYMS_PATH, encoding='utf-8') as f:
+                raw = json.load(f)
+            for canonical, synonyms in raw.items():
+                canon = normalize_symptom(canonical)
+                mapping[canon] = canon
+                for syn in synonyms or []:
+                    mapping.setdefault(normalize_symptom(syn), canon)
+        except Exception as e:
+            print(f"Warning: Could not load symptom synonyms: {e}")
+
+    _synonym_map = mapping
+    return _synonym_map
+
+
+def canonical_term(symptom: str) -> str:
+    """Normalize a symptom and resolve it to its canonical synonym-group term."""
+    term = normalize_symptom(symptom)
+    return _load_synonym_map().get(term, term)
+
+
+def tokenize_symptoms(symptoms: Iterable[str]) -> List[str]:
+    """Turn a collection of symptom strings into canonical index terms."""
+    terms = []
+    for s in symptoms or []:
+        term = canonical_term(s)
+        if term:
+            terms.append(term)
+    return terms
+
+
+class SymptomIndex:
+    """
+    Inverted index over disease symptom profiles with BM25 scoring.
+
+    Each disease is a document whose terms are its canonical symptoms.
+    Posting lists map term -> {disease_id: term_frequency}. Document
+    statistics are kept as running totals, so diseases can be added or
+    removed one at a time without rebuilding the index.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        self.docs: Dict[str, Dict[str, Any]] = {}
+        self._total_length = 0
+        self._fingerprint: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def __contains__(self, disease_id: str) -> bool:
+        return disease_id in self.docs
+
+    @property
+    def avg_doc_length(self) -> float:
+        return self._total_length / len(self.docs) if self.docs else 0.0
+
+    def add_disease(self, disease: Dict[str, Any], category: str = "") -> None:
+        """
+        Index a disease record ({disease_id, name, symptoms, ...}).
+        Re-adding an existing disease_id replaces its previous entry.
+        """
+        disease_id = disease['disease_id']
+        if disease_id in self.docs:
+            self.remove_disease(disease_id)
+        self._fingerprint = None
+
+        terms = tokenize_symptoms(disease.get('symptoms', []))
+        for term in terms:
+            posting = self.postings.setdefault(term, {})
+            posting[disease_id] = posting.get(disease_id, 0) + 1
+
+        self.doc_lengths[disease_id] = len(terms)
+        self._total_length += len(terms)
+        self.docs[disease_id] = {
+            'disease_id': disease_id,
+            'name': disease.get('name', disease_id),
+            'category': category or disease.get('category', ""),
+            'symptoms': list(disease.get('symptoms', [])),
+        }
+
+    def remove_disease(self, disease_id: str) -> bool:
+        """Drop a disease from the index. Returns False if it was not indexed."""
+        doc = self.docs.pop(disease_id, None)
+        if doc is None:
+            return False
+        self._fingerprint = None
+
+        for term in set(tokenize_symptoms(doc['symptoms'])):
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(disease_id, None)
+            if not posting:
+                del self.postings[term]
+
+        self._total_length -= self.doc_lengths.pop(disease_id, 0)
+        return True
+
+    def fingerprint(self) -> str:
+        """
+        Stable hash of the indexed corpus; changes whenever a disease profile does.
+        Memoized until the next add/remove, so it is cheap to check per turn.
+        """
+        if self._fingerprint is None:
+            h = hashlib.sha1()
+            for disease_id in sorted(self.docs):
+                doc = self.docs[disease_id]
+                h.update(json.dumps([disease_id, doc['category'], sorted(doc['symptoms'])]).encode('utf-8'))
+            self._fingerprint = h.hexdigest()[:16]
+        return self._fingerprint
+
+    def idf(self, term: str) -> float:
+        """BM25 idf with the usual +1 smoothing so scores stay non-negative."""
+        n = len(self.docs)
+        df = len(self.postings.get(term, ()))
+        return math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, symptoms: Iterable[str], k: Optional[int] = None,
+               category: Optional[str] = None) -> List[Tuple[str, float]]:
+        """
+        Score diseases against the query symptoms with BM25.
+
+        Args:
+            symptoms: Query symptom strings (synonyms are resolved)
+            k: Max number of results (None for all matches)
+            category: Restrict results to one category
+
+        Returns:
+            [(disease_id, bm25_score), ...] sorted by score desc
+        """
+        avgdl = self.avg_doc_length or 1.0
+        scores: Dict[str, float] = {}
+
+        for term in set(tokenize_symptoms(symptoms)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = self.idf(term)
+            for disease_id, tf in posting.items():
+                if category is not None and self.docs[disease_id]['category'] != category:
+                    continue
+                dl = self.doc_lengths[disease_id]
+                denom = tf + self.k1 * (1.0 - self.b + self.b * dl / avgdl)
+                scores[disease_id] = scores.get(disease_id, 0.0) + idf * tf * (self.k1 + 1.0) / denom
+
+        ranked = sorted(scores.items(), key=lambda x: (-x[1], x[0]))
+        return ranked[:k] if k is not None else ranked
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> Dict[str, float]:
+    """
+    Fuse several ranked id lists: score(d) = sum over lists of 1 / (k + rank(d)).
+
+    Args:
+        rankings: Lists of ids, best first
+        k: RRF damping constant (60 is the standard choice)
+
+    Returns:
+        {id: fused_score}
+    """
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            fused[item_id] = fused.get(item_id, 0.0) + 1.0 / (k + rank)
+    return fused
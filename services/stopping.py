@@ -0,0 +1,249 @@
+# services/stopping.py
+"""
+Stopping policies: decide when the agent has asked enough questions.
+
+Every policy implements should_stop(diseases, question_count), where
+`diseases` is the ranked differential ([{disease, confidence, category}]).
+Policies are built from plain dict configs so thresholds can live in a
+JSON file (STOPPING_POLICY env var) and be re-calibrated offline.
+"""
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from typing import Dict, Any, List, Optional
+import json
+import os
+
+
+# LLM spellings of the search categories (services.vector_search.CATEGORY_SEARCHERS)
+CATEGORY_ALIASES = {
+    "pulmonary": "respiratory",
+    "cardiovascular": "cardiac",
+    "gi": "gastrointestinal",
+    "digestive": "gastrointestinal",
+    "orthopedic": "musculoskeletal",
+    "dermatology": "dermatological",
+    "skin": "dermatological",
+}
+
+
+def normalize_category(category: Any) -> str:
+    """Fold free-text categories from the LLM ("Respiratory ", "GI") onto our category keys."""
+    key = str(category or "").strip().lower()
+    return CATEGORY_ALIASES.get(key, key)
+
+
+def _confidence(item: Dict[str, Any]) -> float:
+    """Agent results carry `confidence`; legacy ddx rows carry `score`."""
+    value = item.get("confidence", item.get("score", 0.0))
+    return float(value) if isinstance(value, (int, float)) else 0.0
+
+
+class StoppingPolicy(ABC):
+    name = "base"
+
+    def __init__(self, max_questions: Optional[int] = 5):
+        self.max_questions = max_questions
+
+    def should_stop(self, diseases: List[Dict[str, Any]], question_count: int) -> bool:
+        if self.max_questions is not None and question_count >= self.max_questions:
+            return True
+        if not diseases:
+            return False
+        return self._confident(diseases)
+
+    @abstractmethod
+    def _confident(self, diseases: List[Dict[str, Any]]) -> bool:
+        """Policy-specific rule, called with a non-empty differential below the question cap."""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": self.name, "max_questions": self.max_questions}
+
+
+class ThresholdPolicy(StoppingPolicy):
+    """
+    Stop if the top disease is very likely, or a clear winner over the runner-up.
+    Limits can be overridden per category of the top disease.
+    """
+    name = "threshold"
+
+    def __init__(
+        self,
+        max_questions: Optional[int] = 5,
+        confident: float = 0.80,
+        clear_winner: float = 0.70,
+        margin: float = 0.20,
+        per_category: Optional[Dict[str, Dict[str, float]]] = None,
+    ):
+        super().__init__(max_questions)
+        self.confident = confident
+        self.clear_winner = clear_winner
+        self.margin = margin
+        self.per_category = {normalize_category(c): v for c, v in (per_category or {}).items()}
+
+    def _limits(self, category: str) -> Dict[str, float]:
+        limits = {"confident": self.confident, "clear_winner": self.clear_winner, "margin": self.margin}
+        limits.update(self.per_category.get(normalize_category(category), {}))
+        return limits
+
+    def _confident(self, diseases: List[Dict[str, Any]]) -> bool:
+        limits = self._limits(diseases[0].get("category", ""))
+        top1 = _confidence(diseases[0])
+        if top1 > limits["confident"]:
+            return True
+        if len(diseases) > 1:
+            top2 = _confidence(diseases[1])
+            if top1 > limits["clear_winner"] and (top1 - top2) > limits["margin"]:
+                return True
+        return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = super().to_dict()
+        d.update(confident=self.confident, clear_winner=self.clear_winner,
+                 margin=self.margin, per_category=self.per_category)
+        return d
+
+
+class MarginPolicy(StoppingPolicy):
+    """Stop if the top score reaches min_top_score or leads the runner-up by delta."""
+    name = "margin"
+
+    def __init__(self, max_questions: Optional[int] = 5, min_top_score: float = 0.88, delta: float = 0.05):
+        super().__init__(max_questions)
+        self.min_top_score = min_top_score
+        self.delta = delta
+
+    def _confident(self, diseases: List[Dict[str, Any]]) -> bool:
+        top1 = _confidence(diseases[0])
+        if top1 >= self.min_top_score:
+            return True
+        return len(diseases) > 1 and (top1 - _confidence(diseases[1])) >= self.delta
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = super().to_dict()
+        d.update(min_top_score=self.min_top_score, delta=self.delta)
+        return d
+
+
+class CalibratedPolicy(StoppingPolicy):
+    """
+    Stop once the top disease's confidence reaches a per-category threshold
+    learned from logged sessions (see fit).
+    """
+    name = "calibrated"
+
+    def __init__(self, max_questions: Optional[int] = 5, thresholds: Optional[Dict[str, float]] = None,
+                 default: float = 0.80):
+        super().__init__(max_questions)
+        self.thresholds = {normalize_category(c): t for c, t in (thresholds or {}).items()}
+        self.default = default
+
+    def _confident(self, diseases: List[Dict[str, Any]]) -> bool:
+        threshold = self.thresholds.get(normalize_category(diseases[0].get("category")), self.default)
+        return _confidence(diseases[0]) >= threshold
+
+    @classmethod
+    def fit(
+        cls,
+        sessions: List[Dict[str, Any]],
+        target_accuracy: float = 0.9,
+        min_samples: int = 20,
+        max_questions: Optional[int] = 5,
+        default: float = 0.80,
+    ) -> "CalibratedPolicy":
+        """
+        Learn the lowest threshold per category whose stops are still correct
+        at least `target_accuracy` of the time. Lower thresholds stop earlier,
+        so this minimises expected questions subject to the accuracy target.
+
+        A candidate threshold is scored like the policy would act: each session
+        counts once, on the first turn (before the question cap) whose top
+        disease is in that category and reaches the threshold. Later turns are
+        never seen by the policy, so they do not count.
+
+        Args:
+            sessions: [{"label": str, "turns": [{"top_diseases": [...], "question_count": int}, ...]}]
+                      `label` is the diagnosis the session should end on.
+            target_accuracy: Required fraction of stops whose top disease equals the label
+            min_samples: Thresholds that stop fewer sessions than this are not trusted
+
+        Returns:
+            CalibratedPolicy
+        """
+        # category -> per session, in turn order: [(top1 confidence, top1 is correct)]
+        observations: Dict[str, List[List[tuple]]] = {}
+        for session in sessions:
+            label = session.get("label")
+            if label is None:
+                continue
+            per_category: Dict[str, List[tuple]] = {}
+            for i, turn in enumerate(session.get("turns", [])):
+                if max_questions is not None and int(turn.get("question_count", i + 1)) >= max_questions:
+                    break  # the question cap stops the session here whatever the threshold
+                top = turn.get("top_diseases") or []
+                if not top:
+                    continue
+                category = normalize_category(top[0].get("category"))
+                per_category.setdefault(category, []).append((_confidence(top[0]), top[0].get("disease") == label))
+            for category, obs in per_category.items():
+                observations.setdefault(category, []).append(obs)
+
+        thresholds: Dict[str, float] = {}
+        for category, session_obs in observations.items():
+            candidates = sorted({conf for obs in session_obs for conf, _ in obs})
+            # Ascending: the first threshold that meets the target is the lowest one
+            for threshold in candidates:
+                stops = [next((ok for conf, ok in obs if conf >= threshold), None) for obs in session_obs]
+                stops = [ok for ok in stops if ok is not None]
+                if len(stops) < min_samples:
+                    break  # higher thresholds only stop fewer sessions
+                if sum(stops) / len(stops) >= target_accuracy:
+                    thresholds[category] = threshold
+                    break
+
+        return cls(max_questions=max_questions, thresholds=thresholds, default=default)
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = super().to_dict()
+        d.update(thresholds=self.thresholds, default=self.default)
+        return d
+
+
+POLICIES = {cls.name: cls for cls in (ThresholdPolicy, MarginPolicy, CalibratedPolicy)}
+
+
+def policy_from_config(config: Dict[str, Any]) -> StoppingPolicy:
+    """Build a policy from {"type": name, **params}."""
+    params = dict(config)
+    kind = params.pop("type", ThresholdPolicy.name)
+    if kind not in POLICIES:
+        raise ValueError(f"Unknown stopping policy: {kind}")
+    return POLICIES[kind](**params)
+
+
+def load_policy(path: str) -> StoppingPolicy:
+    with open(path, encoding="utf-8") as f:
+        return policy_from_config(json.load(f))
+
+
+def save_policy(policy: StoppingPolicy, path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(policy.to_dict(), f, indent=2, sort_keys=True)
+
+
+_policy: Optional[StoppingPolicy] = None
+
+def get_stopping_policy() -> StoppingPolicy:
+    """Policy from the JSON file in $STOPPING_POLICY, else the default ThresholdPolicy."""
+    global _policy
+    if _policy is None:
+        path = os.getenv("STOPPING_POLICY")
+        if path and not os.path.exists(path):
+            print(f"Warning: Could not load stopping policy {path}: file not found; using ThresholdPolicy")
+        elif path:
+            try:
+                _policy = load_policy(path)
+            except Exception as e:
+                print(f"Warning: Could not load stopping policy {path}: {e}")
+        if _policy is None:
+            _policy = ThresholdPolicy()
+    return _policy
@@ -1,8 +1,12 @@
 # services/vector_search.py
+import threading
+from typing import Dict, Any, List
+from services.lexical_index import SymptomIndex, reciprocal_rank_fusion
+from services.category_router import CategoryRouter
 
-def search_respiratory(query: str, k: int = 3):
-    """Mock respiratory search - replace with their real function later"""
-    return [
+# Mock disease corpus per category - replace with their real vector DBs later
+DISEASE_CATALOG: Dict[str, List[Dict[str, Any]]] = {
+    'respiratory': [
         {
             'disease_id': 'pneumonia',
             'name': 'Pneumonia',
@@ -21,11 +25,8 @@ def search_respiratory(query: str, k: int = 3):
             'score': 0.68,
             'symptoms': ['cough', 'fever', 'loss_of_taste', 'fatigue']
         }
-    ]
-
-def search_cardiac(query: str, k: int = 3):
-    """Mock cardiac search"""
-    return [
+    ],
+    'cardiac': [
         {
             'disease_id': 'myocardial_infarction',
             'name': 'Myocardial Infarction',
@@ -38,11 +39,8 @@ def search_cardiac(query: str, k: int = 3):
             'score': 0.38,
             'symptoms': ['chest_pain', 'pressure']
         }
-    ]
-
-def search_gastrointestinal(query: str, k: int = 3):
-    """Mock GI search"""
-    return [
+    ],
+    'gastrointestinal': [
         {
             'disease_id': 'gastritis',
             'name': 'Gastritis',
@@ -55,35 +53,173 @@ def search_gastrointestinal(query: str, k: int = 3):
             'score': 0.28,
             'symptoms': ['heartburn', 'acid_reflux']
         }
-    ]
-
-def search_musculoskeletal(query: str, k: int = 3):
-    """Mock MSK search"""
-    return [
+    ],
+    'musculoskeletal': [
         {
             'disease_id': 'arthritis',
             'name': 'Arthritis',
             'score': 0.28,
             'symptoms': ['joint_pain', 'stiffness', 'swelling']
         }
-    ]
-
-def search_dermatological(query: str, k: int = 3):
-    """Mock derm search"""
-    return [
+    ],
+    'dermatological': [
         {
             'disease_id': 'eczema',
             'name': 'Eczema',
             'score': 0.25,
             'symptoms': ['itching', 'rash', 'dry_skin']
         }
-    ]
+    ],
+}
+
+
+def _mock_results(category: str, k: int):
+    with _corpus_lock:
+        return [dict(d, symptoms=list(d['symptoms'])) for d in DISEASE_CATALOG[category][:k]]
+
+
+def search_respiratory(query: str, k: int = 3):
+    """Mock respiratory search - replace with their real function later"""
+    return _mock_results('respiratory', k)
+
+def search_cardiac(query: str, k: int = 3):
+    """Mock cardiac search"""
+    return _mock_results('cardiac', k)
+
+def search_gastrointestinal(query: str, k: int = 3):
+    """Mock GI search"""
+    return _mock_results('gastrointestinal', k)
+
+def search_musculoskeletal(query: str, k: int = 3):
+    """Mock MSK search"""
+    return _mock_results('musculoskeletal', k)
+
+def search_dermatological(query: str, k: int = 3):
+    """Mock derm search"""
+    return _mock_results('dermatological', k)
+
+
+CATEGORY_SEARCHERS = {
+    'respiratory': search_respiratory,
+    'cardiac': search_cardiac,
+    'gastrointestinal': search_gastrointestinal,
+    'musculoskeletal': search_musculoskeletal,
+    'dermatological': search_dermatological,
+}
+
+
+# Lexical (BM25) index over the symptom profiles of the corpus
+_symptom_index = None
+_category_router = None
+# Guards the catalog, the index and the router: corpus updates and (re)builds
+# never interleave, so a rebuild can't read a half-updated index or outlive a reset
+_corpus_lock = threading.RLock()
+
+def get_symptom_index() -> SymptomIndex:
+    """Build the inverted symptom index on first use."""
+    global _symptom_index
+    with _corpus_lock:
+        if _symptom_index is None:
+            index = SymptomIndex()
+            for category, diseases in DISEASE_CATALOG.items():
+                for disease in diseases:
+                    index.add_disease(disease, category)
+            _symptom_index = index
+        return _symptom_index
+
+def get_category_router() -> CategoryRouter:
+    """Build the category router from the symptom index on first use."""
+    global _category_router
+    with _corpus_lock:
+        if _category_router is None:
+            _category_router = CategoryRouter.from_index(get_symptom_index(), categories=CATEGORY_SEARCHERS)
+        return _category_router
+
+def corpus_fingerprint() -> str:
+    """Fingerprint of the current disease corpus (see SymptomIndex.fingerprint)."""
+    with _corpus_lock:
+        return get_symptom_index().fingerprint()
+
+def add_disease(category: str, disease: Dict[str, Any]) -> None:
+    """
+    Add (or replace) a disease in the corpus and the lexical index incrementally.
+    The category must have a searcher in CATEGORY_SEARCHERS.
+    """
+    global _category_router
+    if category not in CATEGORY_SEARCHERS:
+        raise ValueError(f"Unknown category {category!r}; register a searcher in CATEGORY_SEARCHERS first")
+    with _corpus_lock:
+        # A replaced disease may move category, so drop it everywhere first
+        for diseases in DISEASE_CATALOG.values():
+            diseases[:] = [d for d in diseases if d['disease_id'] != disease['disease_id']]
+        DISEASE_CATALOG[category].append(disease)
+        get_symptom_index().add_disease(disease, category)
+        _category_router = None
+
+def remove_disease(disease_id: str) -> bool:
+    """Remove a disease from the corpus and the lexical index incrementally."""
+    global _category_router
+    with _corpus_lock:
+        for diseases in DISEASE_CATALOG.values():
+            diseases[:] = [d for d in diseases if d['disease_id'] != disease_id]
+        removed = get_symptom_index().remove_disease(disease_id)
+        _category_router = None
+    return removed
+
+
+def hybrid_search(category: str, symptoms: set, k: int = 3, rrf_k: int = 60):
+    """
+    Search one category with both the dense index and the BM25 symptom index,
+    then merge the two rankings with reciprocal-rank fusion.
+
+    Args:
+        category: Category name (key of CATEGORY_SEARCHERS)
+        symptoms: Set of symptom strings
+        k: Number of results to return
+        rrf_k: RRF damping constant
+
+    Returns:
+        list: diseases sorted by fused score. Each keeps its dense `score`
+        (None for lexical-only hits) and gains `bm25_score` and `rrf_score`.
+    """
+    query = " ".join(sorted(symptoms))
+    dense = CATEGORY_SEARCHERS[category](query, k)
+    with _corpus_lock:
+        index = get_symptom_index()
+        lexical = index.search(symptoms, k=k, category=category)
+        docs = {disease_id: dict(index.docs[disease_id]) for disease_id, _ in lexical}
+
+    fused = reciprocal_rank_fusion(
+        [[d['disease_id'] for d in dense], [disease_id for disease_id, _ in lexical]],
+        k=rrf_k,
+    )
+    bm25 = dict(lexical)
+
+    records = {d['disease_id']: d for d in dense}
+    for disease_id, _ in lexical:
+        if disease_id not in records:
+            doc = docs[disease_id]
+            records[disease_id] = {
+                'disease_id': disease_id,
+                'name': doc['name'],
+                'score': None,
+                'symptoms': list(doc['symptoms']),
+            }
+
+    ranked = sorted(records, key=lambda d: -fused[d])[:k]
+    results = []
+    for disease_id in ranked:
+        rec = dict(records[disease_id])
+        rec['bm25_score'] = bm25.get(disease_id, 0.0)
+        rec['rrf_score'] = fused[disease_id]
+        results.append(rec)
+    return results
 
 
 # Wrapper function to search all categories
 def search_all_categories(symptoms: set, k: int = 3):
     """
-    Search all 5 category vector DBs
+    Search all 5 category vector DBs, fused with BM25 over symptom profiles
     
     Args:
         symptoms: Set of symptom strings
@@ -92,12 +228,19 @@ def search_all_categories(symptoms: set, k: int = 3):
     Returns:
         dict: {category: [diseases]}
     """
-    query = " ".join(symptoms)  # Convert set to query string
+    return {category: hybrid_search(category, symptoms, k) for category in CATEGORY_SEARCHERS}
+
+
+def search_routed(symptoms: set, k: int = 3):
+    """
+    Search only the categories the router considers relevant
     
-    return {
-        'respiratory': search_respiratory(query, k),
-        'cardiac': search_cardiac(query, k),
-        'gastrointestinal': search_gastrointestinal(query, k),
-        'musculoskeletal': search_musculoskeletal(query, k),
-        'dermatological': search_dermatological(query, k)
-    }
\ No newline at end of file
+    Args:
+        symptoms: Set of symptom strings
+        k: Max number of results per category
+    
+    Returns:
+        dict: {category: [diseases]} for the routed categories
+    """
+    plan = get_category_router().route(symptoms, k)
+    return {category: hybrid_search(category, symptoms, category_k) for category, category_k in plan.items()}
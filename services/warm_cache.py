@@ -0,0 +1,148 @@
+# services/warm_cache.py
+"""
+Precomputed diagnoses for common symptom sets.
+
+Keys are canonical frozensets of symptoms (synonyms and spelling folded,
+see services.lexical_index), so "chest pain" + "Shortness of breath"
+hits the same entry as {"chest_pain", "shortness_of_breath"}.
+
+The table stores only the agent's differential, question and reasoning.
+Entries are computed as the first question of a session, so they are only
+served on that turn; later turns with the same symptoms (e.g. the user
+answered "no") go to the agent. should_continue is recomputed at serve
+time with the current stopping policy.
+
+Tables are stamped with a version derived from the agent model, the agent
+code (prompt and parsing in services/agent.py) and the disease corpus.
+The version is re-checked on every lookup; a stale table is dropped.
+"""
+from __future__ import annotations
+from typing import Dict, Any, Iterable, Optional, FrozenSet
+import gzip
+import hashlib
+import inspect
+import json
+import os
+import time
+
+from core.llm_client import get_model_id
+from services.lexical_index import tokenize_symptoms
+
+CACHE_FORMAT = 1
+CACHED_FIELDS = ("top_diseases", "clarifying_question", "reasoning")
+# question_count the entries are computed with (and the only one they are served for)
+PRECOMPUTE_QUESTION_COUNT = 1
+
+
+def canonical_key(symptoms: Iterable[str]) -> FrozenSet[str]:
+    return frozenset(tokenize_symptoms(symptoms))
+
+
+_agent_fingerprint: Optional[str] = None
+
+def agent_fingerprint() -> str:
+    """Hash of services/agent.py, so prompt or parsing changes invalidate cached answers."""
+    global _agent_fingerprint
+    if _agent_fingerprint is None:
+        from services import agent
+        _agent_fingerprint = hashlib.sha1(inspect.getsource(agent).encode("utf-8")).hexdigest()[:16]
+    return _agent_fingerprint
+
+
+def current_version() -> str:
+    """Version of the live pipeline: cache format + agent model + agent code + corpus fingerprint."""
+    from services.agent import AGENT_PROVIDER
+    from services.vector_search import corpus_fingerprint
+
+    raw = f"{CACHE_FORMAT}|{get_model_id(AGENT_PROVIDER)}|{agent_fingerprint()}|{corpus_fingerprint()}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+
+class WarmCache:
+    def __init__(self, version: str, entries: Optional[Dict[FrozenSet[str], Dict[str, Any]]] = None):
+        self.version = version
+        self.entries: Dict[FrozenSet[str], Dict[str, Any]] = entries or {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, symptoms) -> bool:
+        return canonical_key(symptoms) in self.entries
+
+    def get(self, symptoms: Iterable[str], question_count: int = PRECOMPUTE_QUESTION_COUNT) -> Optional[Dict[str, Any]]:
+        """Cached agent response for this symptom set at this turn, or None."""
+        key = canonical_key(symptoms)
+        entry = None
+        if key and question_count == PRECOMPUTE_QUESTION_COUNT:
+            entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return {field: entry[field] for field in CACHED_FIELDS if field in entry}
+
+    def put(self, symptoms: Iterable[str], response: Dict[str, Any]) -> None:
+        key = canonical_key(symptoms)
+        # A hit with no differential could end the session with nothing to show
+        if key and response.get("top_diseases"):
+            self.entries[key] = {field: response[field] for field in CACHED_FIELDS if field in response}
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def save(self, path: str) -> None:
+        """Write the table as gzipped JSON; symptom keys become sorted lists."""
+        payload = {
+            "format": CACHE_FORMAT,
+            "version": self.version,
+            "created": time.time(),
+            "entries": [[sorted(key), entry] for key, entry in sorted(self.entries.items(), key=lambda x: sorted(x[0]))],
+        }
+        tmp = path + ".tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, version: str) -> "WarmCache":
+        """Load a table; returns an empty cache if it is missing or built for another version."""
+        if not os.path.exists(path):
+            return cls(version)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                payload = json.load(f)
+        except Exception as e:
+            print(f"Warning: Could not load warm cache {path}: {e}")
+            return cls(version)
+
+        if payload.get("version") != version:
+            print(f"Warning: Warm cache {path} is stale (built for {payload.get('version')}, now {version}); ignoring")
+            return cls(version)
+        return cls(version, {frozenset(symptoms): entry for symptoms, entry in payload.get("entries", [])})
+
+
+_cache: Optional[WarmCache] = None
+
+def reset_warm_cache() -> None:
+    """Drop the loaded table so the next lookup reloads it from disk."""
+    global _cache
+    _cache = None
+
+def get_warm_cache() -> Optional[WarmCache]:
+    """
+    Table from $WARM_CACHE_PATH, or None when the cache is off.
+    If the model, agent code or corpus changed since the table was loaded,
+    it is reloaded against the new version (and so comes back empty if stale).
+    """
+    global _cache
+    path = os.getenv("WARM_CACHE_PATH")
+    if not path:
+        return None
+    version = current_version()
+    if _cache is None or _cache.version != version:
+        _cache = WarmCache.load(path, version)
+    return _cache
@@ -7,3 +7,9 @@ def test_agent_runs():
         {'disease_id':'bronchitis','disease_name':'Bronchitis','score':0.7,'reasons':['cough']},
     ])
     assert ddx and ddx[0]['disease_id'] in ('pneumonia','bronchitis')
+
+def test_agent_prompt_is_independent_of_symptom_order():
+    agent = DiagnosticAgent.__new__(DiagnosticAgent)
+    a = agent._build_context({}, {'symptoms': ['fever', 'cough']})
+    b = agent._build_context({}, {'symptoms': ['cough', 'fever']})
+    assert a == b
@@ -0,0 +1,24 @@
+from services.category_router import CategoryRouter
+from services.lexical_index import SymptomIndex
+
+def _router():
+    index = SymptomIndex()
+    index.add_disease({'disease_id': 'eczema', 'symptoms': ['rash', 'itching']}, 'dermatological')
+    index.add_disease({'disease_id': 'gastritis', 'symptoms': ['nausea', 'bloating']}, 'gastrointestinal')
+    index.add_disease({'disease_id': 'mi', 'symptoms': ['chest_pain', 'nausea']}, 'cardiac')
+    return CategoryRouter.from_index(index)
+
+def test_routes_to_single_category():
+    assert _router().route({'rash', 'itching'}, k=3) == {'dermatological': 3}
+
+def test_low_confidence_widens_to_all_categories():
+    plan = _router().route({'headache'}, k=3)
+    assert set(plan) == {'dermatological', 'gastrointestinal', 'cardiac'}
+
+def test_only_searchable_categories_are_routed():
+    index = SymptomIndex()
+    index.add_disease({'disease_id': 'migraine', 'symptoms': ['headache']}, 'neurological')
+    index.add_disease({'disease_id': 'eczema', 'symptoms': ['rash']}, 'dermatological')
+    router = CategoryRouter.from_index(index, categories=['dermatological'])
+    assert router.route({'headache'}, k=3) == {'dermatological': 3}
+    assert 'neurological' not in router.route({'headache', 'rash'}, k=3)
@@ -0,0 +1,42 @@
+from services.lexical_index import SymptomIndex, reciprocal_rank_fusion
+
+def test_bm25_exact_symptom_match():
+    index = SymptomIndex()
+    index.add_disease({'disease_id': 'covid19', 'name': 'COVID-19', 'symptoms': ['cough', 'loss_of_taste']}, 'respiratory')
+    index.add_disease({'disease_id': 'bronchitis', 'name': 'Bronchitis', 'symptoms': ['cough', 'mucus']}, 'respiratory')
+    hits = index.search(['Loss of taste'])
+    assert [d for d, _ in hits] == ['covid19']
+
+def test_incremental_add_remove():
+    index = SymptomIndex()
+    index.add_disease({'disease_id': 'eczema', 'symptoms': ['rash', 'itching']}, 'dermatological')
+    index.add_disease({'disease_id': 'psoriasis', 'symptoms': ['rash', 'scaling']}, 'dermatological')
+    assert len(index.search(['rash'])) == 2
+    assert index.remove_disease('psoriasis')
+    assert 'scaling' not in index.postings
+    assert [d for d, _ in index.search(['rash'])] == ['eczema']
+    assert index.avg_doc_length == 2.0
+
+def test_rrf_rewards_agreement():
+    fused = reciprocal_rank_fusion([['a', 'b'], ['b', 'c']])
+    assert max(fused, key=fused.get) == 'b'
+
+def test_catalog_add_disease_moves_between_categories():
+    import pytest
+    from services import vector_search
+
+    original = next(d for d in vector_search.DISEASE_CATALOG['respiratory'] if d['disease_id'] == 'pneumonia')
+    moved = dict(original, symptoms=list(original['symptoms']))
+    try:
+        vector_search.add_disease('cardiac', moved)
+        ids = lambda c: [d['disease_id'] for d in vector_search.DISEASE_CATALOG[c]]
+        assert 'pneumonia' not in ids('respiratory')
+        assert 'pneumonia' in ids('cardiac')
+        assert vector_search.get_symptom_index().docs['pneumonia']['category'] == 'cardiac'
+        with pytest.raises(ValueError):
+            vector_search.add_disease('neurological', {'disease_id': 'migraine', 'symptoms': ['headache']})
+    finally:
+        vector_search.remove_disease('pneumonia')
+        vector_search.DISEASE_CATALOG['respiratory'].insert(0, original)
+        vector_search.get_symptom_index().add_disease(original, 'respiratory')
+        vector_search._category_router = None
@@ -0,0 +1,68 @@
+from core.llm_client import get_llm_client
+from core.tracing import TracedLLM, start_trace, use_llm
+from services.agent import DiagnosticAgent
+from services.symptom_extractor import extract_symptoms
+from services.vector_search import search_routed
+from tools.replay import ReplayLLM, replay_sessions
+from utils.turn_log import TurnLogger, invoke_traced, read_turns
+
+
+class FakeLLM:
+    def chat(self, messages, temperature=0.2, **kwargs):
+        if 'Extract medical symptoms' in messages[0]['content']:
+            return '{"present": ["cough", "fever"], "absent": []}'
+        return ('{"top_diseases": [{"disease": "Pneumonia", "confidence": 0.6, "category": "respiratory"}],'
+                ' "clarifying_question": "Any chest pain?", "reasoning": "Cough with fever"}')
+
+
+class Graph:
+    """Runs the same steps as services.agent_graph without langgraph."""
+
+    def invoke(self, state):
+        state['symptoms'].update(extract_symptoms(state['user_input'])['present'])
+        state['question_count'] += 1
+        state['search_results'] = search_routed(state['symptoms'])
+        state['agent_response'] = DiagnosticAgent().process(state['search_results'], {
+            'symptoms': state['symptoms'],
+            'question_count': state['question_count'],
+        })
+        return state
+
+
+def _inputs(question_count):
+    return {'symptoms': set(), 'question_count': question_count, 'user_input': 'I have a cough and fever',
+            'search_results': {}, 'agent_response': {}, 'specialist': '', 'status': 'ongoing'}
+
+
+def test_llm_override_is_traced():
+    fake = FakeLLM()
+    with use_llm(fake), start_trace() as trace:
+        client = get_llm_client("groq")
+        assert isinstance(client, TracedLLM) and client.inner is fake
+        client.chat([{'role': 'user', 'content': 'hi'}], temperature=0.1)
+    assert trace.llm_calls[0]['request']['temperature'] == 0.1
+    assert 'response' in trace.llm_calls[0]
+
+
+def test_recorded_replay_reproduces_logged_turns(tmp_path):
+    logger = TurnLogger(str(tmp_path))
+    with use_llm(FakeLLM()):
+        for session_id in ('a', 'b'):
+            for turn in range(2):
+                invoke_traced(Graph(), _inputs(turn), logger, session_id, turn)
+    logger.close()
+
+    records = list(read_turns(str(tmp_path)))
+    assert len(records) == 4 and all(len(r['llm_calls']) == 2 for r in records)
+
+    rows = replay_sessions(Graph(), records, llm='recorded', workers=2)
+    assert len(rows) == 4
+    assert all(not r['changes'] and r['error'] is None for r in rows)
+    assert sum(r['prompt_mismatches'] for r in rows) == 0
+
+
+def test_replay_llm_flags_prompt_drift():
+    llm = ReplayLLM([{'request': {'messages': [{'role': 'user', 'content': 'old'}]}, 'response': 'x'}])
+    assert llm.chat([{'role': 'user', 'content': 'new'}]) == 'x'
+    assert llm.prompt_mismatches == 1
+    assert llm.chat([]) == '' and llm.exhausted == 1
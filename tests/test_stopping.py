@@ -0,0 +1,73 @@
+from services.stopping import CalibratedPolicy, ThresholdPolicy, policy_from_config
+from utils.threshold import stop_condition
+
+def _ddx(*confs, category='respiratory'):
+    return [{'disease': f"d{i}", 'confidence': c, 'category': category} for i, c in enumerate(confs)]
+
+def test_threshold_defaults_match_previous_rule():
+    policy = ThresholdPolicy()
+    assert policy.should_stop([], 5)
+    assert not policy.should_stop([], 1)
+    assert policy.should_stop(_ddx(0.81), 1)
+    assert policy.should_stop(_ddx(0.75, 0.5), 1)
+    assert not policy.should_stop(_ddx(0.75, 0.6), 1)
+
+def test_per_category_override_and_config_roundtrip():
+    policy = ThresholdPolicy(per_category={'cardiac': {'confident': 0.95}})
+    assert not policy.should_stop(_ddx(0.9, category='cardiac'), 1)
+    assert policy.should_stop(_ddx(0.9), 1)
+    clone = policy_from_config(policy.to_dict())
+    assert clone.to_dict() == policy.to_dict()
+
+def test_calibrated_fit_picks_lowest_accurate_threshold():
+    sessions = [
+        {'label': 'd0', 'turns': [{'top_diseases': _ddx(c)} for c in (0.4, 0.6, 0.9)]},
+        {'label': 'other', 'turns': [{'top_diseases': _ddx(0.5)}]},
+    ]
+    policy = CalibratedPolicy.fit(sessions, target_accuracy=0.9, min_samples=1)
+    assert policy.thresholds == {'respiratory': 0.6}
+
+def test_legacy_stop_condition():
+    assert stop_condition([{'score': 0.9}])
+    assert not stop_condition([{'score': 0.5}, {'score': 0.48}])
+
+def test_calibrated_fit_ignores_turns_after_the_first_stop():
+    # A wrong early guess at 0.6 must not be masked by the later, correct turns
+    sessions = [
+        {'label': 'B', 'turns': [
+            {'top_diseases': [{'disease': 'A', 'confidence': 0.6, 'category': 'respiratory'}]},
+            {'top_diseases': [{'disease': 'B', 'confidence': 0.85, 'category': 'respiratory'}]},
+            {'top_diseases': [{'disease': 'B', 'confidence': 0.9, 'category': 'respiratory'}]},
+        ]}
+        for _ in range(10)
+    ]
+    policy = CalibratedPolicy.fit(sessions, target_accuracy=0.6, min_samples=1)
+    assert policy.thresholds == {'respiratory': 0.85}
+
+def test_thresholds_match_free_text_categories():
+    policy = CalibratedPolicy(thresholds={'respiratory': 0.5})
+    assert policy.should_stop(_ddx(0.6, category='Respiratory '), 1)
+    policy = ThresholdPolicy(per_category={'Cardiac': {'confident': 0.95}})
+    assert not policy.should_stop(_ddx(0.9, category='cardiovascular'), 1)
+
+def test_incomplete_policy_fails_at_construction():
+    import pytest
+    from services.stopping import StoppingPolicy
+
+    class Unfinished(StoppingPolicy):
+        name = "unfinished"
+
+    with pytest.raises(TypeError):
+        Unfinished()
+
+def test_margin_policy_from_config_still_caps_questions():
+    policy = policy_from_config({'type': 'margin'})
+    assert not policy.should_stop(_ddx(0.3), 1)
+    assert policy.should_stop(_ddx(0.3), 5)
+
+def test_missing_policy_file_warns(monkeypatch, capsys):
+    from services import stopping
+    monkeypatch.setenv('STOPPING_POLICY', '/nonexistent/policy.json')
+    monkeypatch.setattr(stopping, '_policy', None)
+    assert isinstance(stopping.get_stopping_policy(), ThresholdPolicy)
+    assert 'Warning: Could not load stopping policy /nonexistent/policy.json' in capsys.readouterr().out
@@ -0,0 +1,48 @@
+from core.tracing import TurnTrace
+from utils.turn_log import TurnLogger, read_turns, segment_paths
+
+def _log(tmp_path, n, **kwargs):
+    logger = TurnLogger(str(tmp_path), **kwargs)
+    for i in range(n):
+        logger.log_turn('s1', i, {'symptoms': ['cough'], 'question_count': i},
+                        {'symptoms': {'fever', 'cough'}, 'status': 'ongoing'}, TurnTrace(), 1.0)
+    logger.close()
+
+def test_roundtrip_and_rotation(tmp_path):
+    _log(tmp_path, 5, segment_bytes=1, batch_size=1)
+    turns = list(read_turns(str(tmp_path)))
+    assert [t['turn'] for t in turns] == [0, 1, 2, 3, 4]
+    assert turns[0]['state']['symptoms'] == ['cough', 'fever']
+    assert len(segment_paths(str(tmp_path))) == 5
+
+def test_torn_tail_is_skipped(tmp_path):
+    _log(tmp_path, 2, batch_size=1)
+    path = segment_paths(str(tmp_path))[-1]
+    with open(path, 'ab') as f:
+        f.write(b'\x1f\x8b\x08garbage')
+    assert len(list(read_turns(str(tmp_path)))) == 2
+
+def test_failed_turn_is_logged_with_partial_trace(tmp_path):
+    import pytest
+    from core.tracing import TracedLLM
+    from utils.turn_log import invoke_traced
+
+    class TimingOut:
+        def chat(self, messages, temperature=0.2, **kwargs):
+            raise TimeoutError("read timed out")
+
+    class Graph:
+        def invoke(self, state):
+            state['symptoms'].add('cough')
+            TracedLLM(TimingOut()).chat([{'role': 'user', 'content': 'hi'}])
+
+    logger = TurnLogger(str(tmp_path))
+    with pytest.raises(TimeoutError):
+        invoke_traced(Graph(), {'symptoms': set(), 'question_count': 0}, logger, 's1', 0)
+    logger.close()
+
+    [record] = list(read_turns(str(tmp_path)))
+    assert record['error'] == 'TimeoutError: read timed out'
+    assert record['input']['symptoms'] == []
+    assert record['state']['symptoms'] == ['cough']
+    assert record['llm_calls'][0]['error'] == 'TimeoutError: read timed out'
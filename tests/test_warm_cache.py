@@ -0,0 +1,68 @@
+from services.warm_cache import WarmCache, canonical_key
+
+RESPONSE = {
+    'top_diseases': [{'disease': 'Pneumonia', 'confidence': 0.6, 'category': 'respiratory'}],
+    'clarifying_question': 'Do you have chills?',
+    'reasoning': 'Cough with fever',
+    'should_continue': True,
+}
+
+def test_key_ignores_spelling_and_order():
+    assert canonical_key(['Chest pain', 'fever']) == canonical_key(['fever', 'chest_pain'])
+
+def test_roundtrip_and_version_invalidation(tmp_path):
+    path = str(tmp_path / 'cache.json.gz')
+    cache = WarmCache('v1')
+    cache.put({'cough', 'fever'}, RESPONSE)
+    cache.put({'headache'}, dict(RESPONSE, top_diseases=[]))
+    cache.save(path)
+
+    loaded = WarmCache.load(path, 'v1')
+    hit = loaded.get(['Fever', 'cough'])
+    assert 'should_continue' not in hit
+    assert hit['top_diseases'][0]['disease'] == 'Pneumonia'
+    assert loaded.get({'headache'}) is None
+    assert loaded.hit_rate == 0.5
+    assert len(WarmCache.load(path, 'v2')) == 0
+
+def test_entry_is_only_served_on_the_turn_it_was_computed_for():
+    cache = WarmCache('v1')
+    cache.put({'chest pain'}, RESPONSE)
+    assert cache.get({'chest pain'}, question_count=1) is not None
+    # User answered "no": same symptoms on later turns must reach the agent, not repeat the question
+    for question_count in (2, 3, 4, 5):
+        assert cache.get({'chest pain'}, question_count=question_count) is None
+
+def test_corpus_change_invalidates_loaded_table(tmp_path, monkeypatch):
+    from services import vector_search
+    from services.warm_cache import current_version, get_warm_cache, reset_warm_cache
+
+    path = str(tmp_path / 'cache.json.gz')
+    cache = WarmCache(current_version())
+    cache.put({'cough', 'fever'}, RESPONSE)
+    cache.save(path)
+    monkeypatch.setenv('WARM_CACHE_PATH', path)
+    reset_warm_cache()
+    try:
+        assert get_warm_cache().get({'cough', 'fever'}) is not None
+        vector_search.add_disease('respiratory', {'disease_id': 'flu', 'name': 'Influenza', 'symptoms': ['fever']})
+        assert get_warm_cache().get({'cough', 'fever'}) is None
+    finally:
+        vector_search.remove_disease('flu')
+        reset_warm_cache()
+
+def test_agent_code_change_invalidates_loaded_table(tmp_path, monkeypatch):
+    from services import warm_cache
+
+    path = str(tmp_path / 'cache.json.gz')
+    cache = WarmCache(warm_cache.current_version())
+    cache.put({'cough', 'fever'}, RESPONSE)
+    cache.save(path)
+    monkeypatch.setenv('WARM_CACHE_PATH', path)
+    warm_cache.reset_warm_cache()
+    try:
+        assert warm_cache.get_warm_cache().get({'cough', 'fever'}) is not None
+        monkeypatch.setattr(warm_cache, '_agent_fingerprint', 'edited-prompt')
+        assert warm_cache.get_warm_cache().get({'cough', 'fever'}) is None
+    finally:
+        warm_cache.reset_warm_cache()
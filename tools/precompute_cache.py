@@ -0,0 +1,134 @@
+# tools/precompute_cache.py
+"""
+Build the warm cache of diagnoses for common symptom sets.
+
+    python -m tools.precompute_cache --out warm_cache.json.gz
+        [--log-dir LOG_DIR] [--seed seeds.txt] [--top 300] [--min-support 3] [--workers 8]
+
+Symptom sets are mined from the turn log (exact canonical sets, most
+frequent first) and/or read from a seed file: one comma-separated set per
+line, or a JSON list of lists. Each set is run through search and the
+diagnostic agent with the configured LLM, and the table is stamped with
+the current model/corpus version.
+
+The cache hit rate and the p50 turn latency with and without the cache
+are reported on --eval-log-dir (default: --log-dir, which is in-sample
+and so optimistic). A hit pays for extraction plus the lookup, and a
+miss pays the logged latency.
+"""
+import argparse
+import contextvars
+import json
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List
+
+from services.warm_cache import PRECOMPUTE_QUESTION_COUNT, WarmCache, canonical_key, current_version
+from tools.replay import percentile
+from utils.turn_log import read_turns
+
+def mine_symptom_sets(records: Iterable[Dict[str, Any]], min_support: int = 3, top: int = 300):
+    counts = Counter()
+    for record in records:
+        state = record.get('state') or {}
+        # Entries are only served on the first turn, so only mine first turns
+        if state.get('question_count') != PRECOMPUTE_QUESTION_COUNT:
+            continue
+        key = canonical_key(state.get('symptoms') or [])
+        if key:
+            counts[key] += 1
+    return [key for key, n in counts.most_common(top) if n >= min_support]
+
+
+def read_seed(path: str) -> List[frozenset]:
+    with open(path, encoding='utf-8') as f:
+        if path.endswith('.json'):
+            rows = json.load(f)
+        else:
+            rows = [line.split(',') for line in f if line.strip() and not line.startswith('#')]
+    return [key for key in (canonical_key(s.strip() for s in row) for row in rows) if key]
+
+
+def compute_entry(symptoms: frozenset) -> Dict[str, Any]:
+    from services.agent import DiagnosticAgent
+    from services.vector_search import search_routed
+
+    symptom_set = set(symptoms)
+    results = search_routed(symptom_set)
+    return DiagnosticAgent().process(results, {
+        'symptoms': symptom_set,
+        'question_count': PRECOMPUTE_QUESTION_COUNT,
+    })
+
+
+def build_cache(symptom_sets: List[frozenset], version: str, workers: int = 8) -> WarmCache:
+    cache = WarmCache(version)
+    # Run workers in a copy of our context so an LLM override set by the caller applies
+    context = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        responses = pool.map(lambda s: context.copy().run(compute_entry, s), symptom_sets)
+        for key, response in zip(symptom_sets, responses):
+            cache.put(key, response)
+    return cache
+
+
+def evaluate(cache: WarmCache, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Hit rate and p50/p95 turn latency over logged turns, without and with the cache."""
+    before, after = [], []
+    for record in records:
+        total = record.get('total_ms', 0.0)
+        start = time.perf_counter()
+        state = record.get('state') or {}
+        hit = cache.get(state.get('symptoms') or [], state.get('question_count')) is not None
+        lookup_ms = (time.perf_counter() - start) * 1000
+        before.append(total)
+        if hit:
+            extract_ms = sum(t['ms'] for t in record.get('node_timings', []) if t['node'] == 'extract')
+            after.append(extract_ms + lookup_ms)
+        else:
+            after.append(total)
+    return {
+        'turns': len(records),
+        'hit_rate': cache.hit_rate,
+        'p50_before_ms': percentile(before, 50),
+        'p50_after_ms': percentile(after, 50),
+        'p95_before_ms': percentile(before, 95),
+        'p95_after_ms': percentile(after, 95),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--out', required=True)
+    parser.add_argument('--log-dir')
+    parser.add_argument('--seed')
+    parser.add_argument('--eval-log-dir', help="traffic to report hit rate/latency on (default: --log-dir)")
+    parser.add_argument('--top', type=int, default=300)
+    parser.add_argument('--min-support', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args(argv)
+    if not args.log_dir and not args.seed:
+        parser.error("need --log-dir and/or --seed")
+
+    records = list(read_turns(args.log_dir)) if args.log_dir else []
+    symptom_sets = mine_symptom_sets(records, args.min_support, args.top)
+    if args.seed:
+        symptom_sets += [s for s in read_seed(args.seed) if s not in symptom_sets]
+
+    version = current_version()
+    cache = build_cache(symptom_sets, version, args.workers)
+    cache.save(args.out)
+    print(f"Wrote {len(cache)} entries (version {version}) to {args.out}")
+
+    eval_dir = args.eval_log_dir or args.log_dir
+    if eval_dir:
+        eval_records = records if eval_dir == args.log_dir else list(read_turns(eval_dir))
+        report = evaluate(cache, eval_records)
+        print(f"Logged turns: {report['turns']}  hit rate: {report['hit_rate']:.1%}")
+        print(f"p50 turn latency: {report['p50_before_ms']:.1f}ms -> {report['p50_after_ms']:.1f}ms")
+        print(f"p95 turn latency: {report['p95_before_ms']:.1f}ms -> {report['p95_after_ms']:.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+# tools/replay.py
+"""
+Replay logged turns through the current agent graph and diff the outcome.
+
+    python -m tools.replay LOG_DIR [--llm recorded|live] [--workers 8] [--session ID ...]
+
+--llm recorded feeds each turn the LLM responses captured in the log, so the
+diff isolates changes in our own code (and "compute" latency excludes LLM
+time). --llm live calls the configured provider again.
+"""
+import argparse
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from core.tracing import use_llm
+from utils.turn_log import invoke_traced, read_turns, to_jsonable
+
+COMPARED_FIELDS = ('status', 'question_count', 'symptoms', 'specialist')
+
+
+class ReplayLLM:
+    """Returns recorded responses in order and counts prompts that drifted."""
+
+    def __init__(self, calls: List[Dict[str, Any]]):
+        self.calls = list(calls)
+        self.position = 0
+        self.prompt_mismatches = 0
+        self.exhausted = 0
+
+    def chat(self, messages, temperature: float = 0.2, **kwargs: Any) -> str:
+        if self.position >= len(self.calls):
+            self.exhausted += 1
+            return ""
+        call = self.calls[self.position]
+        self.position += 1
+        if call['request'].get('messages') != messages:
+            self.prompt_mismatches += 1
+        if 'error' in call:
+            # Reproduce the recorded failure (e.g. a provider timeout)
+            raise RuntimeError(f"recorded LLM failure: {call['error']}")
+        return call['response']
+
+
+def restore_inputs(logged: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn a logged graph input back into a ConversationState."""
+    inputs = dict(logged)
+    inputs['symptoms'] = set(inputs.get('symptoms') or [])
+    return inputs
+
+
+def _top_disease(state: Dict[str, Any]):
+    top = (state.get('agent_response') or {}).get('top_diseases') or []
+    return top[0].get('disease') if top else None
+
+
+def _outcome(state: Dict[str, Any], error: Optional[str]) -> Dict[str, Any]:
+    out = {field: state.get(field) for field in COMPARED_FIELDS}
+    out['failed'] = error is not None
+    out['top_disease'] = _top_disease(state)
+    out['should_continue'] = (state.get('agent_response') or {}).get('should_continue')
+    return out
+
+
+def replay_turn(graph, record: Dict[str, Any], llm: str) -> Dict[str, Any]:
+    replay_llm = ReplayLLM(record.get('llm_calls', [])) if llm == 'recorded' else None
+    inputs = restore_inputs(record['input'])
+    try:
+        if replay_llm is not None:
+            with use_llm(replay_llm):
+                result, trace, total_ms = invoke_traced(graph, inputs)
+        else:
+            result, trace, total_ms = invoke_traced(graph, inputs)
+        error = None
+    except Exception as e:
+        result, trace, total_ms, error = {}, None, 0.0, f"{type(e).__name__}: {e}"
+
+    before = _outcome(record.get('state', {}), record.get('error'))
+    after = _outcome(to_jsonable(result), error)
+    changes = {k: (before[k], after[k]) for k in before if before[k] != after[k]}
+
+    recorded_llm_ms = sum(c.get('duration_ms', 0.0) for c in record.get('llm_calls', []))
+    return {
+        'session_id': record['session_id'],
+        'turn': record['turn'],
+        'recorded_ms': record.get('total_ms', 0.0),
+        'replay_ms': total_ms,
+        'recorded_compute_ms': record.get('total_ms', 0.0) - recorded_llm_ms,
+        'replay_compute_ms': total_ms - (trace.llm_ms if trace else 0.0),
+        'changes': changes,
+        'error': error,
+        'recorded_error': record.get('error'),
+        'prompt_mismatches': replay_llm.prompt_mismatches if replay_llm else 0,
+    }
+
+
+def replay_sessions(graph, records: List[Dict[str, Any]], llm: str = 'recorded', workers: int = 8):
+    """Replay sessions in parallel; turns within a session run in order."""
+    sessions: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        sessions.setdefault(record['session_id'], []).append(record)
+
+    def run(turns):
+        return [replay_turn(graph, r, llm) for r in sorted(turns, key=lambda r: r['turn'])]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(run, sessions.values()))
+    return [row for rows in results for row in rows]
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(q / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def print_report(rows: List[Dict[str, Any]], llm: str) -> int:
+    """Print the latency/regression diff. Returns the number of regressed turns."""
+    key = 'ms' if llm == 'live' else 'compute_ms'
+    label = 'total' if llm == 'live' else 'compute (excl. LLM)'
+    before = [r[f'recorded_{key}'] for r in rows]
+    after = [r[f'replay_{key}'] for r in rows]
+
+    print(f"Replayed {len(rows)} turns from {len({r['session_id'] for r in rows})} sessions (llm={llm})")
+    print(f"Latency, {label}:")
+    print(f"  {'':6}{'recorded':>12}{'replay':>12}{'delta':>12}")
+    for q in (50, 95, 99):
+        b, a = percentile(before, q), percentile(after, q)
+        print(f"  p{q:<5}{b:>10.1f}ms{a:>10.1f}ms{a - b:>+10.1f}ms")
+
+    regressed = [r for r in rows if r['changes']]
+    drifted = sum(1 for r in rows if r['prompt_mismatches'])
+    failed = sum(1 for r in rows if r['recorded_error'])
+    print(f"Turns that failed when logged: {failed}, on replay: {sum(1 for r in rows if r['error'])}")
+    print(f"Outcome changes: {len(regressed)} turns")
+    if llm == 'recorded':
+        print(f"Turns with changed LLM prompts: {drifted}")
+    for r in regressed[:20]:
+        detail = f"{r['changes']}" + (f" ({r['error']})" if r['error'] else "")
+        print(f"  {r['session_id']}#{r['turn']}: {detail}")
+    if len(regressed) > 20:
+        print(f"  ... {len(regressed) - 20} more")
+    return len(regressed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('log_dir')
+    parser.add_argument('--llm', choices=('recorded', 'live'), default='recorded')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--session', action='append', help="only replay these session ids")
+    parser.add_argument('--fail-on-change', action='store_true', help="exit 1 if any outcome changed")
+    args = parser.parse_args(argv)
+
+    from services.agent_graph import get_graph
+
+    records = [r for r in read_turns(args.log_dir) if not args.session or r['session_id'] in args.session]
+    rows = replay_sessions(get_graph(), records, args.llm, args.workers)
+    regressed = print_report(rows, args.llm)
+    return 1 if regressed and args.fail_on_change else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
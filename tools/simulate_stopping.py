@@ -0,0 +1,120 @@
+# tools/simulate_stopping.py
+"""
+Offline simulator for stopping policies over logged sessions.
+
+    python -m tools.simulate_stopping LOG_DIR [--policy cfg.json ...]
+        [--target-accuracy 0.9] [--holdout 0.3] [--fit-out calibrated.json]
+
+Each logged turn records the agent's differential, so a policy can be
+replayed without calling the LLM: walk a session's turns and stop at the
+first turn the policy accepts. The session's label is its final top
+disease. Sessions the policy would not have stopped within the logged
+turns are reported as unresolved, since we cannot know how they continue.
+
+A CalibratedPolicy is fitted on the non-holdout sessions. All policies
+are scored on the holdout sessions.
+"""
+import argparse
+import hashlib
+from typing import Any, Dict, List
+
+from services.stopping import (
+    CalibratedPolicy, MarginPolicy, StoppingPolicy, ThresholdPolicy, load_policy, save_policy,
+)
+from utils.turn_log import read_turns
+
+# One extraction call plus one agent call per turn when the log has no LLM trace
+DEFAULT_CALLS_PER_TURN = 2
+
+
+def sessions_from_turns(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Group logged turns into {"session_id", "label", "turns": [...]} in turn order."""
+    grouped: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        grouped.setdefault(record['session_id'], []).append(record)
+
+    sessions = []
+    for session_id, records in grouped.items():
+        turns = []
+        for record in sorted(records, key=lambda r: r['turn']):
+            state = record.get('state') or {}
+            turns.append({
+                'question_count': int(state.get('question_count', record['turn'] + 1)),
+                'top_diseases': (state.get('agent_response') or {}).get('top_diseases') or [],
+                'llm_calls': len(record.get('llm_calls') or []) or DEFAULT_CALLS_PER_TURN,
+            })
+        final = next((t['top_diseases'][0].get('disease') for t in reversed(turns) if t['top_diseases']), None)
+        sessions.append({'session_id': session_id, 'label': final, 'turns': turns})
+    return sessions
+
+
+def simulate(policy: StoppingPolicy, sessions: List[Dict[str, Any]]) -> Dict[str, Any]:
+    completed = correct = questions = calls = 0
+    for session in sessions:
+        spent = 0
+        for turn in session['turns']:
+            spent += turn['llm_calls']
+            if policy.should_stop(turn['top_diseases'], turn['question_count']):
+                completed += 1
+                questions += turn['question_count']
+                calls += spent
+                top = turn['top_diseases']
+                correct += bool(top) and top[0].get('disease') == session['label']
+                break
+
+    return {
+        'sessions': len(sessions),
+        'completed': completed,
+        'unresolved': len(sessions) - completed,
+        'accuracy': correct / completed if completed else 0.0,
+        'avg_questions': questions / completed if completed else 0.0,
+        'avg_llm_calls': calls / completed if completed else 0.0,
+    }
+
+
+def _in_holdout(session_id: str, fraction: float) -> bool:
+    bucket = int(hashlib.sha1(session_id.encode('utf-8')).hexdigest()[:8], 16) / 0xFFFFFFFF
+    return bucket < fraction
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('log_dir')
+    parser.add_argument('--policy', action='append', default=[], help="extra policy JSON config to score")
+    parser.add_argument('--target-accuracy', type=float, default=0.9)
+    parser.add_argument('--min-samples', type=int, default=20)
+    parser.add_argument('--holdout', type=float, default=0.3, help="fraction of sessions kept for scoring")
+    parser.add_argument('--fit-out', help="write the fitted CalibratedPolicy config here")
+    args = parser.parse_args(argv)
+
+    sessions = sessions_from_turns(list(read_turns(args.log_dir)))
+    train = [s for s in sessions if not _in_holdout(s['session_id'], args.holdout)]
+    test = [s for s in sessions if _in_holdout(s['session_id'], args.holdout)]
+    if not test:
+        parser.error(f"no held-out sessions among {len(sessions)} (--holdout {args.holdout}); "
+                     "log more sessions or raise --holdout")
+
+    calibrated = CalibratedPolicy.fit(train, target_accuracy=args.target_accuracy, min_samples=args.min_samples)
+    if args.fit_out:
+        save_policy(calibrated, args.fit_out)
+
+    policies = {
+        'threshold (default)': ThresholdPolicy(),
+        'margin (legacy)': MarginPolicy(),
+        f'calibrated @{args.target_accuracy:.0%}': calibrated,
+    }
+    for path in args.policy:
+        policies[path] = load_policy(path)
+
+    print(f"{len(sessions)} sessions: fitted on {len(train)}, scored on {len(test)}")
+    print(f"{'policy':<28}{'done':>6}{'unres.':>8}{'acc':>8}{'questions':>11}{'LLM calls':>11}")
+    for name, policy in policies.items():
+        r = simulate(policy, test)
+        print(f"{name:<28}{r['completed']:>6}{r['unresolved']:>8}{r['accuracy']:>8.1%}"
+              f"{r['avg_questions']:>11.2f}{r['avg_llm_calls']:>11.2f}")
+    if calibrated.thresholds:
+        print("Calibrated thresholds: " + ", ".join(f"{c or '?'}={t:.2f}" for c, t in sorted(calibrated.thresholds.items())))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,209 @@
+# utils/turn_log.py
+"""
+Append-only, gzip-compressed, segment-rotated log of conversation turns.
+
+Each record holds the graph input, the resulting ConversationState, raw
+LLM requests/responses and per-node timings. Turns that raise are logged
+too, with an `error` field. Records are handed to a
+background thread, so the turn itself only pays for a shallow snapshot.
+
+Layout: <dir>/turns-000001.jsonl.gz, turns-000002.jsonl.gz, ...
+Each write is a complete gzip member, so a crash loses at most the last batch.
+"""
+import atexit
+import glob
+import gzip
+import json
+import os
+import queue
+import re
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from core.tracing import TurnTrace, start_trace
+
+LOG_VERSION = 1
+_SEGMENT_RE = re.compile(r"turns-(\d+)\.jsonl\.gz$")
+_STOP = object()
+
+
+def to_jsonable(value: Any) -> Any:
+    """Copy a state value into plain JSON types (sets become sorted lists)."""
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (set, frozenset)):
+        return sorted(to_jsonable(v) for v in value)
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def segment_paths(directory: str):
+    """Segment files in write order."""
+    paths = glob.glob(os.path.join(directory, "turns-*.jsonl.gz"))
+    return sorted(p for p in paths if _SEGMENT_RE.search(p))
+
+
+class TurnLogger:
+    def __init__(self, directory: str, segment_bytes: int = 16 * 1024 * 1024, batch_size: int = 64):
+        """
+        Args:
+            directory: Where segments are written (created if missing)
+            segment_bytes: Start a new segment once the current one reaches this size
+            batch_size: Max records compressed into one gzip member
+        """
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.batch_size = batch_size
+        os.makedirs(directory, exist_ok=True)
+
+        existing = segment_paths(directory)
+        last = int(_SEGMENT_RE.search(existing[-1]).group(1)) if existing else 0
+        # Never append to a segment from a previous process; it may end in a torn write
+        self._seq = last + 1
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="turn-logger", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def current_segment(self) -> str:
+        return os.path.join(self.directory, f"turns-{self._seq:06d}.jsonl.gz")
+
+    def log_turn(
+        self,
+        session_id: str,
+        turn: int,
+        inputs: Dict[str, Any],
+        result: Dict[str, Any],
+        trace: TurnTrace,
+        total_ms: float,
+        error: Optional[str] = None,
+    ) -> None:
+        """
+        Queue one turn for writing. `inputs` should be snapshotted with
+        to_jsonable() before graph.invoke, since the graph mutates it.
+        For a failed turn, `result` is the partial state and `error` the exception.
+        """
+        self._queue.put({
+            "v": LOG_VERSION,
+            "ts": time.time(),
+            "session_id": session_id,
+            "turn": turn,
+            "input": inputs,
+            "state": to_jsonable(result),
+            "llm_calls": list(trace.llm_calls),
+            "node_timings": list(trace.node_timings),
+            "total_ms": total_ms,
+            "error": error,
+        })
+
+    def flush(self) -> None:
+        """Block until every queued record is on disk."""
+        self._queue.join()
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            while item is not _STOP and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+
+            records = [r for r in batch if r is not _STOP]
+            try:
+                if records:
+                    self._write(records)
+            except Exception as e:
+                print(f"Warning: Could not write turn log: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+            if any(r is _STOP for r in batch):
+                return
+
+    def _write(self, records) -> None:
+        payload = "".join(json.dumps(r, default=str) + "\n" for r in records).encode("utf-8")
+        path = self.current_segment
+        with open(path, "ab") as f:
+            f.write(gzip.compress(payload))
+        if os.path.getsize(path) >= self.segment_bytes:
+            self._seq += 1
+
+
+def read_turns(directory: str) -> Iterator[Dict[str, Any]]:
+    """Yield logged turns in write order, skipping a torn trailing batch."""
+    for path in segment_paths(directory):
+        with open(path, "rb") as f:
+            data = f.read()
+        while data:
+            d = zlib.decompressobj(wbits=31)
+            try:
+                chunk = d.decompress(data)
+            except zlib.error:
+                break
+            if not d.eof:
+                break
+            for line in chunk.decode("utf-8").splitlines():
+                if line.strip():
+                    yield json.loads(line)
+            data = d.unused_data
+
+
+def invoke_traced(
+    graph,
+    inputs: Dict[str, Any],
+    logger: Optional[TurnLogger] = None,
+    session_id: str = "",
+    turn: int = 0,
+) -> Tuple[Dict[str, Any], TurnTrace, float]:
+    """
+    Run graph.invoke under a trace. Returns (result, trace, total_ms).
+
+    With a logger the turn is also logged. A turn that raises (e.g. an LLM
+    timeout) is logged with its partial state, trace and an `error` field,
+    then the exception is re-raised.
+    """
+    logged_inputs = to_jsonable(inputs) if logger is not None else None
+    with start_trace() as trace:
+        start = time.perf_counter()
+        try:
+            result = graph.invoke(inputs)
+        except Exception as e:
+            if logger is not None:
+                # No final state on failure; `inputs` carries any in-place updates (e.g. symptoms)
+                total_ms = (time.perf_counter() - start) * 1000
+                logger.log_turn(session_id, turn, logged_inputs, inputs, trace, total_ms,
+                                error=f"{type(e).__name__}: {e}")
+            raise
+        total_ms = (time.perf_counter() - start) * 1000
+    if logger is not None:
+        logger.log_turn(session_id, turn, logged_inputs, result, trace, total_ms)
+    return result, trace, total_ms
+
+
+_logger: Optional[TurnLogger] = None
+
+def get_turn_logger() -> Optional[TurnLogger]:
+    """Shared logger writing to $TURN_LOG_DIR, or None when logging is off."""
+    global _logger
+    directory = os.getenv("TURN_LOG_DIR")
+    if not directory:
+        return None
+    if _logger is None:
+        _logger = TurnLogger(directory)
+    return _logger